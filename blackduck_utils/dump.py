@@ -0,0 +1,98 @@
+import os
+import json
+import mmap
+import logging
+from typing import Callable, Iterable, Iterator, Dict, Any, Optional, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+RecordKey = Callable[[Dict[str, Any]], Optional[Hashable]]
+
+def write_dump(records: Iterable[Dict[str, Any]], path: str, append: bool = False) -> int:
+    """Write records to a JSON lines dump, one record per line. Returns the number written."""
+    count = 0
+    with open(path, 'a' if append else 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    logger.debug(f"Wrote {count} records to {path}")
+    return count
+
+def unique_records(records: Iterable[Dict[str, Any]], key: RecordKey) -> Iterator[Dict[str, Any]]:
+    """Yield records, skipping any whose non-empty key was already seen."""
+    seen = set()
+    for record in records:
+        record_key = key(record)
+        if record_key:
+            if record_key in seen:
+                continue
+            seen.add(record_key)
+        yield record
+
+def _iter_lines(path: str) -> Iterator[Tuple[int, bytes, bool]]:
+    """Yield (line number, line, is last line) for the non-empty lines of a file,
+    read through a read-only memory map."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # Empty files cannot be memory-mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            previous = None
+            for lineno, line in enumerate(iter(mm.readline, b''), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                if previous:
+                    yield previous + (False,)
+                previous = (lineno, line)
+            if previous:
+                yield previous + (True,)
+
+class Dump:
+    """Read-only view over one or more JSON lines dumps written by write_dump.
+
+    Records are decoded lazily while iterating, so the dumps are never loaded
+    into memory as a whole. If key is given, records with the same non-empty
+    key are only yielded once, e.g. when shard dumps overlap. The number of
+    records is remembered from the last complete iteration so len() after a
+    filtering pass does not read the dumps again.
+    """
+
+    def __init__(self, *paths: str, key: Optional[RecordKey] = None):
+        if not paths:
+            raise ValueError('at least one dump path is required')
+        self.paths = paths
+        self.key = key
+        self._count = None
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        for path in self.paths:
+            for lineno, line, last in _iter_lines(path):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    if last:
+                        # An interrupted append leaves a partial last record
+                        logger.warning(f"Skipping incomplete record on line {lineno} of {path}")
+                        continue
+                    raise ValueError(f"Invalid record on line {lineno} of {path}: {e}") from e
+                yield record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        records = self._records()
+        if self.key:
+            records = unique_records(records, self.key)
+        count = 0
+        for record in records:
+            count += 1
+            yield record
+        self._count = count
+
+    def __len__(self) -> int:
+        if self._count is None:
+            for _ in self:
+                pass
+        return self._count
+
+    def __bool__(self) -> bool:
+        return any(True for path in self.paths for _ in _iter_lines(path))
@@ -0,0 +1,38 @@
+import logging
+from bisect import bisect_left
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+def build_age_index(records: Iterable[Dict[str, Any]], field: str, group_by: Optional[str] = None) -> Tuple[List[datetime], Dict[str, List[datetime]]]:
+    """Parse the field timestamps once into sorted lists for the whole hub and per group.
+
+    Records without the field are left out, as they are by the find_inactive_* functions.
+    """
+    index = []
+    groups = {}
+    for record in records:
+        value = record.get(field)
+        if not value:
+            continue
+        timestamp = datetime.strptime(value, TIMESTAMP_FORMAT)
+        index.append(timestamp)
+        if group_by:
+            groups.setdefault(record.get(group_by), []).append(timestamp)
+    index.sort()
+    for timestamps in groups.values():
+        timestamps.sort()
+    return index, groups
+
+def count_inactive(index: List[datetime], days_inactive: int, now: Optional[datetime] = None) -> int:
+    """Count the timestamps in a sorted index older than the given number of days."""
+    cutoff_date = (now or datetime.now()) - timedelta(days=days_inactive)
+    return bisect_left(index, cutoff_date)
+
+def inactivity_histogram(index: List[datetime], thresholds: Iterable[int], now: Optional[datetime] = None) -> Dict[int, int]:
+    """Count the timestamps in a sorted index older than each threshold in days."""
+    now = now or datetime.now()
+    return {days: count_inactive(index, days, now) for days in sorted(thresholds)}
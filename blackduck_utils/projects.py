@@ -1,16 +1,28 @@
 import requests
 import logging
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime, timedelta
+from itertools import chain
 from blackduck_utils.auth import AuthBase
+from blackduck_utils.dump import unique_records
 
 logger = logging.getLogger(__name__)
 
-def get_project_versions(session: requests.Session, auth: AuthBase, hub_url: str) -> List[Dict[str, Any]]:
-    """Fetch project versions from the Blackduck hub, handling pagination."""
+def get_project_versions(session: requests.Session, auth: AuthBase, hub_url: str,
+                         shard_index: int = 0, shard_count: int = 1) -> List[Dict[str, Any]]:
+    """Fetch project versions from the Blackduck hub, handling pagination.
+
+    The /api/projects pages are dealt round-robin across shard_count shards and
+    only the pages belonging to shard_index are crawled, so independent workers
+    can each fetch one shard and merge the results with merge_project_versions.
+    """
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid shard {shard_index}/{shard_count}")
+
     project_versions = []
     url = f"{hub_url}/api/projects"
-    params = {'offset': 0, 'limit': 100}  # Adjust limit as needed
+    limit = 100  # Adjust limit as needed
+    params = {'offset': shard_index * limit, 'limit': limit}
 
     while True:
         try:
@@ -34,7 +46,7 @@ def get_project_versions(session: requests.Session, auth: AuthBase, hub_url: str
         if len(items) < params['limit']:
             break  # No more pages
 
-        params['offset'] += params['limit']
+        params['offset'] += params['limit'] * shard_count
 
     return project_versions
 
@@ -69,7 +81,15 @@ def get_versions_for_project(session: requests.Session, auth: AuthBase, project_
 
     return versions
 
-def find_inactive_project_versions(versions: List[Dict[str, Any]], days_inactive: int) -> List[Dict[str, Any]]:
+def project_version_key(version: Dict[str, Any]) -> Optional[str]:
+    """Identify a project version by its URL, for dropping duplicates across shards."""
+    return version.get('_meta', {}).get('href')
+
+def merge_project_versions(shards: Iterable[Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Combine project versions from several shards, dropping duplicates."""
+    return list(unique_records(chain.from_iterable(shards), project_version_key))
+
+def find_inactive_project_versions(versions: Iterable[Dict[str, Any]], days_inactive: int) -> List[Dict[str, Any]]:
     """Find project versions that have been inactive for a specified number of days."""
     inactive_versions = []
     cutoff_date = datetime.now() - timedelta(days=days_inactive)
@@ -1,9 +1,12 @@
 import os
 import gettext
 from os import getenv
-import ConfigParser
-import string
 import apt_pkg
+import pickle
+import copy
+import hashlib
+import stat
+import tempfile
 
 #from gettext import gettext as _
 import gettext
@@ -29,12 +32,12 @@ class Template:
 
     def has_component(self, comp):
         ''' Check if the distribution provides the given component '''
-        return comp in map(lambda c: c.name, self.components)
+        return comp in [c.name for c in self.components]
     
     def is_mirror(self, url):
         ''' Check if a given url of a repository is a valid mirror '''
         proto, hostname, dir = split_url(url)
-        if self.mirror_set.has_key(hostname):
+        if hostname in self.mirror_set:
             return self.mirror_set[hostname].has_repository(proto, dir)
         else:
             return False
@@ -68,7 +71,7 @@ class Mirror:
     def add_repository(self, proto, dir):
         self.repositories.append(Repository(proto, dir))
     def get_repositories_for_proto(self, proto):
-        return filter(lambda r: r.proto == proto, self.repositories)
+        return [r for r in self.repositories if r.proto == proto]
     def has_repository(self, proto, dir):
         if dir is None:
             return False
@@ -77,7 +80,7 @@ class Mirror:
                 return True
         return False
     def get_repo_urls(self):
-        return map(lambda r: r.get_url(self.hostname), self.repositories)
+        return [r.get_url(self.hostname) for r in self.repositories]
     def get_location(self):
         return self.location
     def set_location(self, location):
@@ -94,8 +97,151 @@ class Repository:
 
 def split_url(url):
     ''' split a given URL into the protocoll, the hostname and the dir part '''
-    return map(lambda a,b: a, re.split(":*\/+", url, maxsplit=2),
-                              [None, None, None])
+    return (re.split(r":*/+", url, maxsplit=2) + [None, None, None])[:3]
+
+match_loc = re.compile(r"^#LOC:(.+)$")
+match_mirror_line = re.compile(r"^(#LOC:.+)|(((http)|(ftp)|(rsync)|(file)|(https))://[A-Za-z/\.:\-_]+)$")
+#match_mirror_line = re.compile(r".+")
+
+# process wide caches, shared by all DistInfo instances
+_lsb_dist = None
+_mirror_sets = {}       # MirrorsFile -> (signature, mirror set)
+_snapshots = {}         # snapshot key -> (sources, pickled DistInfo state)
+
+def snapshot_dir():
+    ''' Directory holding the compiled DistInfo snapshots '''
+    if os.geteuid() == 0:
+        # never trust a cache dir inherited from the calling user via sudo
+        return "/var/cache/python-apt"
+    cache_home = getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "python-apt")
+
+def lsb_release_id():
+    ''' Distributor ID from lsb_release, only queried once per process '''
+    global _lsb_dist
+    if _lsb_dist is None:
+        pipe = os.popen("lsb_release -i -s")
+        _lsb_dist = pipe.read().strip()
+        pipe.close()
+    return _lsb_dist
+
+def file_signature(fname):
+    ''' (mtime, size) of a file, or None if it can not be read '''
+    try:
+        st = os.stat(fname)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+def read_mirror_set(fname):
+    ''' Parse a MirrorsFile into a dict of hostname -> Mirror, cached per process.
+        Returns the signature the file had before it was read together with
+        a copy of the mirror set, so changing it does not touch the cache '''
+    signature = file_signature(fname)
+    if fname in _mirror_sets and _mirror_sets[fname][0] == signature:
+        return (signature, copy.deepcopy(_mirror_sets[fname][1]))
+    mirror_set = {}
+    # every file is parsed on its own, so a #LOC: does not carry over
+    # into the next MirrorsFile
+    location = None
+    try:
+        with open(fname) as f:
+            mirror_data = [line for line in map(str.strip, f)
+                           if match_mirror_line.match(line)]
+    except:
+        print("WARNING: Failed to read mirror file")
+        mirror_data = []
+    for line in mirror_data:
+        if line.startswith("#LOC:"):
+            location = match_loc.sub(r"\1", line)
+            continue
+        (proto, hostname, dir) = split_url(line)
+        if hostname in mirror_set:
+            mirror_set[hostname].add_repository(proto, dir)
+        else:
+            mirror_set[hostname] = Mirror(proto, hostname, dir, location)
+    _mirror_sets[fname] = (signature, mirror_set)
+    return (signature, copy.deepcopy(mirror_set))
+
+def sources_valid(sources):
+    ''' Check that none of the files a snapshot was built from changed '''
+    for (fname, signature) in sources:
+        if file_signature(fname) != signature:
+            return False
+    return True
+
+def snapshot_fname(key):
+    return os.path.join(snapshot_dir(),
+                        "distinfo-%s.pickle" % hashlib.md5(repr(key).encode()).hexdigest())
+
+def trusted(st):
+    ''' Check that a file is ours and nobody else can write to it '''
+    return (st.st_uid == os.geteuid() and
+            not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+def read_snapshot(key):
+    ''' Unpickle the on-disk snapshot, refusing files other users could
+        have written '''
+    st = os.lstat(snapshot_dir())
+    if not stat.S_ISDIR(st.st_mode) or not trusted(st):
+        return None
+    fd = os.open(snapshot_fname(key), os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    f = os.fdopen(fd, "rb")
+    try:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or not trusted(st):
+            return None
+        return pickle.load(f)
+    finally:
+        f.close()
+
+def load_snapshot(key):
+    ''' Parsed DistInfo state for key from the process wide cache or the
+        on-disk snapshot, or None if it is missing, out of date or broken '''
+    entry = _snapshots.get(key)
+    try:
+        if entry is None:
+            entry = read_snapshot(key)
+            if entry is None:
+                return None
+        (sources, data) = entry
+        if not sources_valid(sources):
+            _snapshots.pop(key, None)
+            return None
+        # every instance gets its own copy of the templates
+        state = pickle.loads(data)
+        if not isinstance(state, dict):
+            raise TypeError("snapshot state is not a dict")
+    except Exception:
+        # the snapshot is only an optimisation, treat it as a miss
+        _snapshots.pop(key, None)
+        return None
+    _snapshots[key] = entry
+    return state
+
+def save_snapshot(key, sources, state):
+    ''' Keep the parsed DistInfo state in the process wide cache and write
+        it atomically to the on-disk snapshot '''
+    entry = (sources, pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+    _snapshots[key] = entry
+    tmp_fname = None
+    try:
+        if not os.path.isdir(snapshot_dir()):
+            os.makedirs(snapshot_dir(), 0o700)
+        (fd, tmp_fname) = tempfile.mkstemp(dir=snapshot_dir())
+        f = os.fdopen(fd, "wb")
+        try:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.rename(tmp_fname, snapshot_fname(key))
+    except Exception:
+        # the snapshot is only an optimisation, parse again next time
+        if tmp_fname is not None:
+            try:
+                os.unlink(tmp_fname)
+            except OSError:
+                pass
 
 class DistInfo:
     def __init__(self,
@@ -103,28 +249,51 @@ class DistInfo:
                  base_dir = "/usr/share/python-apt/templates"):
         self.metarelease_uri = ''
         self.templates = []
-        self.arch = apt_pkg.Config.Find("APT::Architecture")
-
-        location = None
-        match_loc = re.compile(r"^#LOC:(.+)$")
-        match_mirror_line = re.compile(r"^(#LOC:.+)|(((http)|(ftp)|(rsync)|(file)|(https))://[A-Za-z/\.:\-_]+)$")
-        #match_mirror_line = re.compile(r".+")
+        self.arch = apt_pkg.config.find("APT::Architecture")
 
         if not dist:
-            pipe = os.popen("lsb_release -i -s")
-            dist = pipe.read().strip()
-            pipe.close()
-            del pipe
+            dist = lsb_release_id()
 
         self.dist = dist
 
+        # the snapshot holds untranslated descriptions, so it does not
+        # depend on the locale or the installed translations
+        key = (dist, os.path.abspath(base_dir), self.arch)
+        state = load_snapshot(key)
+        if state is not None:
+            self.__dict__.update(state)
+        else:
+            sources = self.parse(dist, base_dir)
+            state = {}
+            for attr in ("templates", "metarelease_uri", "changelogs_uri"):
+                if hasattr(self, attr):
+                    state[attr] = getattr(self, attr)
+            save_snapshot(key, sources, state)
+        self.translate()
 
+    def translate(self):
+        ''' Translate the changelog URI and the descriptions '''
+        if hasattr(self, "changelogs_uri"):
+            self.changelogs_uri = _(self.changelogs_uri)
+        for template in self.templates:
+            if template.description is not None:
+                template.description = _(template.description)
+            for component in template.components:
+                if component.description is not None:
+                    component.set_description(_(component.description))
+                if component.description_long is not None:
+                    component.set_description_long(_(component.description_long))
+
+    def parse(self, dist, base_dir):
+        ''' Parse the .info template file and the MirrorsFiles it references,
+            returning (file name, signature) for every file read '''
         map_mirror_sets = {}
 
         dist_fname = "%s/%s.info" % (base_dir, dist)
+        sources = [(dist_fname, file_signature(dist_fname))]
         dist_file = open (dist_fname)
         if not dist_file:
-            return
+            return sources
         template = None
         component = None
         for line in dist_file:
@@ -134,7 +303,7 @@ class DistInfo:
             field = tokens[0].strip ()
             value = tokens[1].strip ()
             if field == 'ChangelogURI':
-                self.changelogs_uri = _(value)
+                self.changelogs_uri = value
             elif field == 'MetaReleaseURI':
                 self.metarelease_uri = value
             elif field == 'Suite':
@@ -167,38 +336,24 @@ class DistInfo:
                 template.match_uri = value
             elif (field == 'MirrorsFile' or 
                   field == 'MirrorsFile-%s' % self.arch):
-                if not map_mirror_sets.has_key(value):
-                    mirror_set = {}
-                    try:
-                        mirror_data = filter(match_mirror_line.match,
-                                             map(string.strip, open(value)))
-                    except:
-                        print "WARNING: Failed to read mirror file"
-                        mirror_data = []
-                    for line in mirror_data:
-                        if line.startswith("#LOC:"):
-                            location = match_loc.sub(r"\1", line)
-                            continue
-                        (proto, hostname, dir) = split_url(line)
-                        if mirror_set.has_key(hostname):
-                            mirror_set[hostname].add_repository(proto, dir)
-                        else:
-                            mirror_set[hostname] = Mirror(proto, hostname, dir, location)
-                    map_mirror_sets[value] = mirror_set
+                if value not in map_mirror_sets:
+                    (signature, map_mirror_sets[value]) = read_mirror_set(value)
+                    sources.append((value, signature))
                 template.mirror_set = map_mirror_sets[value]
             elif field == 'Description':
-                template.description = _(value)
+                template.description = value
             elif field == 'Component':
                 if component and not template.has_component(component.name):
                     template.components.append(component)
                 component = Component(value)
             elif field == 'CompDescription':
-                component.set_description(_(value))
+                component.set_description(value)
             elif field == 'CompDescriptionLong':
-                component.set_description_long(_(value))
+                component.set_description_long(value)
         self.finish_template(template, component)
         template=None
         component=None
+        return sources
 
     def finish_template(self, template, component):
         " finish the current tempalte "
@@ -223,17 +378,17 @@ class DistInfo:
 
 if __name__ == "__main__":
     d = DistInfo ("Ubuntu", "/usr/share/python-apt/templates")
-    print d.changelogs_uri
+    print(d.changelogs_uri)
     for template in d.templates:
-        print "\nSuite: %s" % template.name
-        print "Desc: %s" % template.description
-        print "BaseURI: %s" % template.base_uri
-        print "MatchURI: %s" % template.match_uri
+        print("\nSuite: %s" % template.name)
+        print("Desc: %s" % template.description)
+        print("BaseURI: %s" % template.base_uri)
+        print("MatchURI: %s" % template.match_uri)
         if template.mirror_set != {}:
-            print "Mirrors: %s" % template.mirror_set.keys()
+            print("Mirrors: %s" % list(template.mirror_set.keys()))
         for comp in template.components:
-            print " %s -%s -%s" % (comp.name, 
-                                   comp.description, 
-                                   comp.description_long)
+            print(" %s -%s -%s" % (comp.name,
+                                   comp.description,
+                                   comp.description_long))
         for child in template.children:
-            print "  %s" % child.description
+            print("  %s" % child.description)
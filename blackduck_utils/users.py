@@ -1,6 +1,6 @@
 import requests
 import logging
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from blackduck_utils.auth import AuthBase  
 
@@ -35,7 +35,11 @@ def get_users(session: requests.Session, auth: AuthBase, hub_url: str) -> List[D
 
     return users
 
-def find_inactive_users(users: List[Dict[str, Any]], days_inactive: int) -> List[Dict[str, Any]]:
+def user_key(user: Dict[str, Any]) -> Optional[str]:
+    """Identify a user by its URL, or its user name, for dropping duplicates across dumps."""
+    return user.get('_meta', {}).get('href') or user.get('userName')
+
+def find_inactive_users(users: Iterable[Dict[str, Any]], days_inactive: int) -> List[Dict[str, Any]]:
     """Find users who have been inactive for a specified number of days."""
     inactive_users = []
     cutoff_date = datetime.now() - timedelta(days=days_inactive)
@@ -1,30 +1,98 @@
 import requests
 import logging
 import argparse
-from typing import Any
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple, Union
 from blackduck_utils.auth import BearerAuth
 from blackduck_utils.projects import get_project_versions, find_inactive_project_versions, archive_project_version, delete_project_version
+from blackduck_utils.projects import merge_project_versions, project_version_key
+from blackduck_utils.dump import Dump, write_dump
+from blackduck_utils.inactivity import build_age_index, inactivity_histogram
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard specification of the form i/N."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected i/N")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected 0 <= i < N")
+    return index, count
+
+def positive_int(value: str) -> int:
+    """Parse a number of days that must be at least 1."""
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number of days '{value}'")
+    if days < 1:
+        raise argparse.ArgumentTypeError(f"Invalid number of days '{value}', expected at least 1")
+    return days
+
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(description="Archive or delete inactive project versions from Blackduck hub.")
-    parser.add_argument('--hub-url', type=str, required=True, help='Blackduck hub URL')
-    parser.add_argument('--access-token', type=str, required=True, help='Access token for authentication')
-    parser.add_argument('--days-inactive', type=int, required=True, help='Number of days to check for inactivity')
+    parser.add_argument('--hub-url', type=str, help='Blackduck hub URL')
+    parser.add_argument('--access-token', type=str, help='Access token for authentication')
+    parser.add_argument('--days-inactive', type=int, help='Number of days to check for inactivity')
     parser.add_argument('--archive', action='store_true', help='Archive inactive project versions')
     parser.add_argument('--delete', action='store_true', help='Delete project versions instead of archiving them')
+    parser.add_argument('--shard', type=parse_shard, help='Only crawl shard i of N of the projects, given as i/N')
+    parser.add_argument('--workers', type=int, default=1, help='Crawl the projects in this many parallel worker processes')
+    parser.add_argument('--output', type=str, help='Write the fetched project versions to this dump file and exit')
+    parser.add_argument('--from-dump', type=str, nargs='+', metavar='FILE', help='Read project versions from dump files written by --output instead of crawling the hub')
+    parser.add_argument('--histogram', type=positive_int, nargs='+', metavar='DAYS', help='Report how many project versions are inactive at each number of days and exit')
     parser.add_argument('--log-level', type=str, default='INFO', help='Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)')
     args = parser.parse_args()
 
+    if args.days_inactive is None and not args.histogram and not args.output:
+        parser.error("--days-inactive is required unless reporting a --histogram or writing --output.")
     if args.archive and args.delete:
         parser.error("Specify either --archive or --delete, not both.")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if args.workers > 1 and args.shard:
+        parser.error("Specify either --workers or --shard, not both.")
+    if args.from_dump and args.output:
+        parser.error("Specify either --from-dump or --output, not both.")
+    if args.histogram and (args.archive or args.delete or args.output):
+        parser.error("--histogram only reports and cannot be combined with --archive, --delete or --output.")
+    if args.from_dump and (args.shard or args.workers > 1):
+        parser.error("--shard and --workers only apply when crawling the hub, not with --from-dump.")
+    if args.from_dump and (args.archive or args.delete):
+        # A dump may be days old, so never act on the live hub from it
+        parser.error("--from-dump is for reporting only and cannot be combined with --archive or --delete.")
+    if not args.from_dump and (not args.hub_url or not args.access_token):
+        parser.error("--hub-url and --access-token are required unless reading --from-dump.")
     
     return args
 
+def crawl_shard(hub_url: str, access_token: str, shard_index: int, shard_count: int) -> List[Dict[str, Any]]:
+    """Fetch one shard of the project versions in its own session."""
+    with requests.Session() as session:
+        auth = BearerAuth(session, access_token, hub_url)
+        return get_project_versions(session, auth, hub_url, shard_index, shard_count)
+
+def fetch_project_versions(session: requests.Session, auth: Any, args: argparse.Namespace) -> Union[List[Dict[str, Any]], Dump]:
+    """Read project versions from dump files or crawl them from the hub."""
+    if args.from_dump:
+        # Shards crawled separately may overlap if projects changed in between
+        return Dump(*args.from_dump, key=project_version_key)
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(crawl_shard, args.hub_url, args.access_token, index, args.workers)
+                       for index in range(args.workers)]
+            return merge_project_versions([future.result() for future in futures])
+
+    shard_index, shard_count = args.shard or (0, 1)
+    return get_project_versions(session, auth, args.hub_url, shard_index, shard_count)
+
 def main() -> None:
     """Main function to execute the script."""
     args = parse_args()
@@ -32,13 +100,29 @@ def main() -> None:
 
     with requests.Session() as session:
         try:
-            auth = BearerAuth(session, args.access_token, args.hub_url)
-            project_versions = get_project_versions(session, auth, args.hub_url)
-            logger.info(f"Total project versions fetched: {len(project_versions)}")
+            auth = BearerAuth(session, args.access_token, args.hub_url) if args.hub_url and args.access_token else None
+            project_versions = fetch_project_versions(session, auth, args)
+            if args.output:
+                logger.info(f"Total project versions fetched: {len(project_versions)}")
+                write_dump(project_versions, args.output)
+                logger.info(f"Project versions written to {args.output}")
+                return
             if not project_versions:
                 logger.info("No project versions found or unable to fetch project versions.")
                 return
+            if args.histogram:
+                now = datetime.now()  # One cutoff for every row
+                index, projects = build_age_index(project_versions, 'lastScanDate', group_by='projectName')
+                logger.info(f"Total project versions fetched: {len(project_versions)}")
+                logger.info(f"Project versions inactive per number of days (of {len(index)} scanned):")
+                for days, count in inactivity_histogram(index, args.histogram, now).items():
+                    logger.info(f"{days} days: {count}")
+                for project_name, project_index in sorted(projects.items()):
+                    counts = ', '.join(f"{days} days: {count}" for days, count in inactivity_histogram(project_index, args.histogram, now).items())
+                    logger.info(f"Project: {project_name}, {counts}")
+                return
             inactive_versions = find_inactive_project_versions(project_versions, args.days_inactive)
+            logger.info(f"Total project versions fetched: {len(project_versions)}")
             logger.info(f"Total inactive project versions found: {len(inactive_versions)}")
             logger.info(f"Project versions inactive for more than {args.days_inactive} days:")
             for version in inactive_versions:
@@ -1,27 +1,54 @@
 import requests
 import logging
 import argparse
+from datetime import datetime
 from typing import Any
 from blackduck_utils.auth import BearerAuth
-from blackduck_utils.users import get_users, find_inactive_users, deactivate_user, delete_user
+from blackduck_utils.users import get_users, find_inactive_users, deactivate_user, delete_user, user_key
+from blackduck_utils.dump import Dump, write_dump
+from blackduck_utils.inactivity import build_age_index, inactivity_histogram
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def positive_int(value: str) -> int:
+    """Parse a number of days that must be at least 1."""
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid number of days '{value}'")
+    if days < 1:
+        raise argparse.ArgumentTypeError(f"Invalid number of days '{value}', expected at least 1")
+    return days
+
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(description="Deactivate or delete inactive users from Blackduck hub.")
-    parser.add_argument('--hub-url', type=str, required=True, help='Blackduck hub URL')
-    parser.add_argument('--access-token', type=str, required=True, help='Access token for authentication')
-    parser.add_argument('--days-inactive', type=int, required=True, help='Number of days to check for inactivity')
+    parser.add_argument('--hub-url', type=str, help='Blackduck hub URL')
+    parser.add_argument('--access-token', type=str, help='Access token for authentication')
+    parser.add_argument('--days-inactive', type=int, help='Number of days to check for inactivity')
     parser.add_argument('--deactivate', action='store_true', help='Deactivate inactive users')
     parser.add_argument('--delete', action='store_true', help='Delete users instead of deactivating them')
+    parser.add_argument('--output', type=str, help='Write the fetched users to this dump file and exit')
+    parser.add_argument('--from-dump', type=str, nargs='+', metavar='FILE', help='Read users from dump files written by --output instead of crawling the hub')
+    parser.add_argument('--histogram', type=positive_int, nargs='+', metavar='DAYS', help='Report how many users are inactive at each number of days and exit')
     parser.add_argument('--log-level', type=str, default='INFO', help='Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)')
     args = parser.parse_args()
 
+    if args.days_inactive is None and not args.histogram and not args.output:
+        parser.error("--days-inactive is required unless reporting a --histogram or writing --output.")
     if args.deactivate and args.delete:
         parser.error("Specify either --deactivate or --delete, not both.")
+    if args.from_dump and args.output:
+        parser.error("Specify either --from-dump or --output, not both.")
+    if args.histogram and (args.deactivate or args.delete or args.output):
+        parser.error("--histogram only reports and cannot be combined with --deactivate, --delete or --output.")
+    if args.from_dump and (args.deactivate or args.delete):
+        # A dump may be days old, so never act on the live hub from it
+        parser.error("--from-dump is for reporting only and cannot be combined with --deactivate or --delete.")
+    if not args.from_dump and (not args.hub_url or not args.access_token):
+        parser.error("--hub-url and --access-token are required unless reading --from-dump.")
     
     return args
 
@@ -32,13 +59,29 @@ def main() -> None:
 
     with requests.Session() as session:
         try:
-            auth = BearerAuth(session, args.access_token, args.hub_url)
-            users = get_users(session, auth, args.hub_url)
-            logger.info(f"Total users fetched: {len(users)}")
+            auth = BearerAuth(session, args.access_token, args.hub_url) if args.hub_url and args.access_token else None
+            if args.from_dump:
+                users = Dump(*args.from_dump, key=user_key)
+            else:
+                users = get_users(session, auth, args.hub_url)
+            if args.output:
+                logger.info(f"Total users fetched: {len(users)}")
+                write_dump(users, args.output)
+                logger.info(f"Users written to {args.output}")
+                return
             if not users:
                 logger.info("No users found or unable to fetch users.")
                 return
+            if args.histogram:
+                now = datetime.now()  # One cutoff for every row
+                index, _ = build_age_index(users, 'lastLogin')
+                logger.info(f"Total users fetched: {len(users)}")
+                logger.info(f"Users inactive per number of days (of {len(index)} with a login):")
+                for days, count in inactivity_histogram(index, args.histogram, now).items():
+                    logger.info(f"{days} days: {count}")
+                return
             inactive_users = find_inactive_users(users, args.days_inactive)
+            logger.info(f"Total users fetched: {len(users)}")
             logger.info(f"Total inactive users found: {len(inactive_users)}")
             logger.info(f"Users inactive for more than {args.days_inactive} days:")
             for user in inactive_users:
@@ -0,0 +1,58 @@
+import pytest
+from blackduck_utils.dump import Dump, write_dump
+
+@pytest.fixture
+def dump_path(tmp_path):
+    return str(tmp_path / 'users.jsonl')
+
+def test_write_and_read_dump(dump_path):
+    users = [
+        {'userName': 'user1', 'lastLogin': '2022-01-01T00:00:00.000Z'},
+        {'userName': 'user2'}
+    ]
+    assert write_dump(users, dump_path) == 2
+    dump = Dump(dump_path)
+    assert len(dump) == 2
+    assert list(dump) == users
+
+def test_append_dump(dump_path):
+    write_dump([{'userName': 'user1'}], dump_path)
+    write_dump([{'userName': 'user2'}], dump_path, append=True)
+    assert [user['userName'] for user in Dump(dump_path)] == ['user1', 'user2']
+
+def test_empty_dump(dump_path):
+    write_dump([], dump_path)
+    dump = Dump(dump_path)
+    assert len(dump) == 0
+    assert list(dump) == []
+
+def test_dump_drops_duplicate_keys(tmp_path):
+    shard0 = str(tmp_path / 'shard0.jsonl')
+    shard1 = str(tmp_path / 'shard1.jsonl')
+    write_dump([{'userName': 'user1'}, {'userName': 'user2'}], shard0)
+    write_dump([{'userName': 'user2'}, {'userName': 'user3'}], shard1)
+    dump = Dump(shard0, shard1, key=lambda user: user['userName'])
+    assert [user['userName'] for user in dump] == ['user1', 'user2', 'user3']
+    assert len(dump) == 3
+
+def test_dump_counts_in_single_pass(dump_path, mocker):
+    write_dump([{'userName': 'user1'}, {'userName': 'user2'}], dump_path)
+    dump = Dump(dump_path)
+    assert dump
+    users = list(dump)
+    iter_lines = mocker.patch('blackduck_utils.dump._iter_lines')
+    assert len(dump) == len(users) == 2
+    iter_lines.assert_not_called()
+
+def test_dump_skips_incomplete_last_record(dump_path, caplog):
+    write_dump([{'userName': 'user1'}], dump_path)
+    with open(dump_path, 'a') as f:
+        f.write('{"userName": "us')
+    assert [user['userName'] for user in Dump(dump_path)] == ['user1']
+    assert f"line 2 of {dump_path}" in caplog.text
+
+def test_dump_rejects_invalid_record(dump_path):
+    with open(dump_path, 'w') as f:
+        f.write('{"userName": "user1"}\n{"userName": \n{"userName": "user3"}\n')
+    with pytest.raises(ValueError, match=f"line 2 of {dump_path}"):
+        list(Dump(dump_path))
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from blackduck_utils.dump import Dump, write_dump
+from blackduck_utils.inactivity import build_age_index, count_inactive, inactivity_histogram
+from blackduck_utils.projects import project_version_key
+
+def _timestamp(days_ago, now):
+    return (now - timedelta(days=days_ago)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+def test_build_age_index():
+    now = datetime.now()
+    versions = [
+        {'projectName': 'Project1', 'versionName': 'v1', 'lastScanDate': _timestamp(400, now)},
+        {'projectName': 'Project1', 'versionName': 'v2', 'lastScanDate': _timestamp(10, now)},
+        {'projectName': 'Project2', 'versionName': 'v1', 'lastScanDate': _timestamp(100, now)},
+        {'projectName': 'Project2', 'versionName': 'v2'}
+    ]
+    index, projects = build_age_index(versions, 'lastScanDate', group_by='projectName')
+    assert len(index) == 3
+    assert index == sorted(index)
+    assert len(projects['Project1']) == 2
+    assert len(projects['Project2']) == 1
+    assert count_inactive(index, 365, now) == 1
+
+def test_inactivity_histogram():
+    now = datetime.now()
+    users = [{'userName': f'user{days}', 'lastLogin': _timestamp(days, now)} for days in (10, 45, 100, 200, 400)]
+    index, _ = build_age_index(users, 'lastLogin')
+    histogram = inactivity_histogram(index, [365, 30, 90, 180], now)
+    assert list(histogram) == [30, 90, 180, 365]
+    assert histogram == {30: 4, 90: 3, 180: 2, 365: 1}
+
+def test_inactivity_histogram_overlapping_shards(tmp_path):
+    now = datetime.now()
+    versions = {name: {'projectName': 'Project1', 'versionName': name, 'lastScanDate': _timestamp(100, now),
+                       '_meta': {'href': f'http://example.com/project1/versions/{name}'}}
+                for name in ('a', 'b', 'c')}
+    shard0 = str(tmp_path / 'shard0.jsonl')
+    shard1 = str(tmp_path / 'shard1.jsonl')
+    write_dump([versions['a'], versions['b']], shard0)
+    write_dump([versions['b'], versions['c']], shard1)
+    index, projects = build_age_index(Dump(shard0, shard1, key=project_version_key), 'lastScanDate', group_by='projectName')
+    assert inactivity_histogram(index, [30], now) == {30: 3}
+    assert inactivity_histogram(projects['Project1'], [30], now) == {30: 3}
@@ -1,7 +1,7 @@
 import pytest
 import requests
 from datetime import datetime, timedelta
-from blackduck_utils.projects import get_project_versions, find_inactive_project_versions
+from blackduck_utils.projects import get_project_versions, find_inactive_project_versions, merge_project_versions
 
 @pytest.fixture
 def mock_session(mocker):
@@ -47,4 +47,36 @@ def test_find_inactive_project_versions():
     inactive_versions = find_inactive_project_versions(versions, days_inactive)
     print(f"Inactive versions: {inactive_versions}")
     assert len(inactive_versions) == 1
-    assert inactive_versions[0]['versionName'] == 'v1'
\ No newline at end of file
+    assert inactive_versions[0]['versionName'] == 'v1'
+
+def test_get_project_versions_shard(mock_session, mocker):
+    mocker.patch('blackduck_utils.projects.get_versions_for_project',
+                 side_effect=lambda session, auth, project_url, project_name: [{'versionName': 'v1', 'projectName': project_name}])
+    pages = [
+        # Full projects page for shard 1 of 3
+        [{'_meta': {'href': f'http://example.com/project{i}'}, 'name': f'Project{i}'} for i in range(100)],
+        # Short projects page, the last one for this shard
+        [{'_meta': {'href': 'http://example.com/project100'}, 'name': 'Project100'}]
+    ]
+    offsets = []
+
+    def get(url, auth, params):
+        offsets.append(params['offset'])
+        items = pages[len(offsets) - 1]
+        return mocker.Mock(status_code=200, json=lambda: {'items': items})
+
+    mock_session.get.side_effect = get
+    hub_url = 'http://example.com'
+    project_versions = get_project_versions(mock_session, None, hub_url, shard_index=1, shard_count=3)
+    assert len(project_versions) == 101
+    assert project_versions[-1]['projectName'] == 'Project100'
+    assert offsets == [100, 400]
+
+def test_merge_project_versions():
+    shards = [
+        [{'versionName': 'v1', '_meta': {'href': 'http://example.com/project1/versions/1'}}],
+        [{'versionName': 'v2', '_meta': {'href': 'http://example.com/project2/versions/2'}},
+         {'versionName': 'v1', '_meta': {'href': 'http://example.com/project1/versions/1'}}]
+    ]
+    merged = merge_project_versions(shards)
+    assert [version['versionName'] for version in merged] == ['v1', 'v2']
@@ -0,0 +1,117 @@
+import os
+import sys
+import pickle
+import importlib
+import pytest
+
+INFO = """Suite: stable
+RepositoryType: deb
+BaseURI: http://deb.example.com/debian/
+MatchURI: deb.example.com/debian
+MirrorsFile: {mirrors}
+Description: Stable
+Component: main
+CompDescription: Officially supported
+"""
+
+MIRRORS = """#LOC:DE
+http://mirror.example.de/debian/
+"""
+
+@pytest.fixture
+def scrape(mocker, tmp_path, monkeypatch):
+    apt_pkg = mocker.Mock()
+    apt_pkg.config.find.return_value = 'amd64'
+    monkeypatch.setitem(sys.modules, 'apt_pkg', apt_pkg)
+    sys.modules.pop('blackduck_utils.scrape', None)  # Fresh process wide caches
+    module = importlib.import_module('blackduck_utils.scrape')
+    monkeypatch.setattr(module, 'snapshot_dir', lambda: str(tmp_path / 'cache'))
+    yield module
+    sys.modules.pop('blackduck_utils.scrape', None)
+
+@pytest.fixture
+def base_dir(tmp_path):
+    mirrors = tmp_path / 'mirrors.txt'
+    mirrors.write_text(MIRRORS)
+    (tmp_path / 'Test.info').write_text(INFO.format(mirrors=mirrors))
+    return str(tmp_path)
+
+def _snapshot_files(tmp_path):
+    cache = tmp_path / 'cache'
+    return [str(path) for path in cache.iterdir()] if cache.exists() else []
+
+def test_snapshot_hit(scrape, base_dir, tmp_path, mocker):
+    scrape.DistInfo('Test', base_dir)
+    assert len(_snapshot_files(tmp_path)) == 1
+    scrape._snapshots.clear()  # Only the on-disk snapshot is left, as in a new process
+    parse = mocker.spy(scrape.DistInfo, 'parse')
+    dist = scrape.DistInfo('Test', base_dir)
+    parse.assert_not_called()
+    template = dist.templates[0]
+    assert template.name == 'stable'
+    assert template.description == 'Stable'
+    assert template.components[0].description == 'Officially supported'
+    assert template.mirror_set['mirror.example.de'].location == 'DE'
+    assert template.is_mirror('http://mirror.example.de/debian/')
+
+def test_snapshot_miss_after_change(scrape, base_dir, tmp_path, mocker):
+    scrape.DistInfo('Test', base_dir)
+    info = tmp_path / 'Test.info'
+    info.write_text(info.read_text().replace('Description: Stable', 'Description: Stable release'))
+    parse = mocker.spy(scrape.DistInfo, 'parse')
+    dist = scrape.DistInfo('Test', base_dir)
+    parse.assert_called_once()
+    assert dist.templates[0].description == 'Stable release'
+
+def test_corrupt_snapshot(scrape, base_dir, tmp_path, mocker):
+    scrape.DistInfo('Test', base_dir)
+    scrape._snapshots.clear()
+    for path in _snapshot_files(tmp_path):
+        with open(path, 'wb') as f:
+            f.write(pickle.dumps(5))
+    parse = mocker.spy(scrape.DistInfo, 'parse')
+    dist = scrape.DistInfo('Test', base_dir)
+    parse.assert_called_once()
+    assert dist.templates[0].name == 'stable'
+
+def test_untrusted_snapshot(scrape, base_dir, tmp_path, mocker):
+    scrape.DistInfo('Test', base_dir)
+    scrape._snapshots.clear()
+    for path in _snapshot_files(tmp_path):
+        os.chmod(path, 0o666)
+    load = mocker.spy(scrape.pickle, 'load')
+    parse = mocker.spy(scrape.DistInfo, 'parse')
+    scrape.DistInfo('Test', base_dir)
+    load.assert_not_called()
+    parse.assert_called_once()
+
+def test_snapshot_is_translated_after_loading(scrape, base_dir, tmp_path, mocker):
+    mocker.patch.object(scrape.gettext, 'dgettext', side_effect=lambda domain, s: s.upper())
+    assert scrape.DistInfo('Test', base_dir).templates[0].description == 'STABLE'
+    scrape._snapshots.clear()
+    # A language pack update changes the translation without touching the templates
+    mocker.patch.object(scrape.gettext, 'dgettext', side_effect=lambda domain, s: s.lower())
+    dist = scrape.DistInfo('Test', base_dir)
+    assert dist.templates[0].description == 'stable'
+    assert dist.templates[0].components[0].description == 'officially supported'
+
+def test_mirrors_file_changed_while_parsing(scrape, base_dir, tmp_path, mocker):
+    mirrors = tmp_path / 'mirrors.txt'
+    read_mirror_set = scrape.read_mirror_set
+
+    def racing_read_mirror_set(fname):
+        result = read_mirror_set(fname)
+        with open(fname, 'a') as f:
+            f.write('http://mirror.example.com/debian/\n')
+        return result
+
+    patch = mocker.patch.object(scrape, 'read_mirror_set', side_effect=racing_read_mirror_set)
+    assert 'mirror.example.com' not in scrape.DistInfo('Test', base_dir).templates[0].mirror_set
+    patch.stop()
+    assert 'mirror.example.com' in mirrors.read_text()
+    assert 'mirror.example.com' in scrape.DistInfo('Test', base_dir).templates[0].mirror_set
+
+def test_failed_snapshot_write_leaves_no_temp_file(scrape, base_dir, tmp_path, mocker):
+    mocker.patch.object(scrape.os, 'rename', side_effect=OSError('read-only'))
+    assert scrape.DistInfo('Test', base_dir).templates[0].name == 'stable'
+    assert _snapshot_files(tmp_path) == []
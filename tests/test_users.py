@@ -1,7 +1,8 @@
 import pytest
 import requests
 from datetime import datetime, timedelta
-from blackduck_utils.users import get_users, find_inactive_users
+from blackduck_utils.users import get_users, find_inactive_users, user_key
+from blackduck_utils.dump import Dump, write_dump
 
 @pytest.fixture
 def mock_session(mocker):
@@ -31,4 +32,9 @@ def test_find_inactive_users():
     inactive_users = find_inactive_users(users, days_inactive)
     print(f"Inactive users: {inactive_users}")
     assert len(inactive_users) == 1
-    assert inactive_users[0]['userName'] == 'user1'
\ No newline at end of file
+    assert inactive_users[0]['userName'] == 'user1'
+def test_user_key_drops_duplicates_across_dumps(tmp_path):
+    path = str(tmp_path / 'users.jsonl')
+    write_dump([{'userName': 'user1', '_meta': {'href': 'http://example.com/api/users/1'}}, {'userName': 'user2'}], path)
+    users = Dump(path, path, key=user_key)
+    assert [user['userName'] for user in users] == ['user1', 'user2']